@@ -10,6 +10,7 @@ from .database import Database
 from .config import get_settings
 from .models import UserCreate, UserResponse
 from .auth import create_user, authenticate_user, get_user_by_id
+from .states import WEATHER_STATES, get_vocabulary
 from jose import JWTError, jwt
 from typing import Optional, Dict
 import json
@@ -90,10 +91,10 @@ async def load_default_data():
     global default_data
     try:
         if os.path.exists(DEFAULT_CSV_PATH):
-            transition_matrix, states = compute_transition_matrix(DEFAULT_CSV_PATH)
+            transition_matrix, vocabulary = compute_transition_matrix(DEFAULT_CSV_PATH)
             default_data = {
                 "transition_matrix": transition_matrix,
-                "states": states,
+                "vocabulary": vocabulary,
                 "filename": "default"
             }
             print("Default data loaded successfully")
@@ -116,31 +117,19 @@ def compute_transition_matrix(file_path: str) -> tuple:
     # Load the CSV file
     data = pd.read_csv(file_path)
     
-    # Clean the weather states by stripping whitespace and converting to lowercase
-    weather_states = data['weather'].str.strip().str.lower()
-    
-    # Get the list of unique states and sort them for consistency
-    states = sorted(weather_states.unique())
+    # Normalize and validate the weather states, encoding them as uint8 codes
+    codes = WEATHER_STATES.encode(data['weather'])
     
-    # Validate states
-    expected_states = {"drizzle", "rain", "sun", "snow", "fog"}
-    invalid_states = set(states) - expected_states
-    if invalid_states:
-        raise ValueError(f"Invalid weather states found: {invalid_states}. Expected states are: {expected_states}")
+    # Keep only the states present in the file (sorted for consistency)
+    vocabulary = WEATHER_STATES.subset(codes)
+    codes = WEATHER_STATES.recode(codes, vocabulary)
     
-    n_states = len(states)
-
-    # Create a mapping from state to index
-    state_to_index = {state: i for i, state in enumerate(states)}
+    n_states = len(vocabulary)
 
-    # Initialize the transition count matrix
-    transition_counts = np.zeros((n_states, n_states))
-
-    # Count transitions
-    for i in range(len(weather_states) - 1):
-        current_state = state_to_index[weather_states[i]]
-        next_state = state_to_index[weather_states[i + 1]]
-        transition_counts[current_state, next_state] += 1
+    # Count transitions by flattening each (current, next) pair into one index
+    pairs = codes[:-1].astype(np.intp) * n_states + codes[1:]
+    transition_counts = np.bincount(pairs, minlength=n_states * n_states)
+    transition_counts = transition_counts.reshape(n_states, n_states).astype(float)
 
     # Normalize the transition counts to get probabilities
     row_sums = transition_counts.sum(axis=1, keepdims=True)
@@ -162,7 +151,7 @@ def compute_transition_matrix(file_path: str) -> tuple:
     if not np.allclose(row_sums, 1.0):
         transition_matrix = transition_matrix / row_sums[:, np.newaxis]
     
-    return transition_matrix, states
+    return transition_matrix, vocabulary
 
 async def load_user_data(user_id: str) -> None:
     try:
@@ -172,23 +161,23 @@ async def load_user_data(user_id: str) -> None:
         if data:
             user_data[user_id] = {
                 "transition_matrix": np.array(data["transition_matrix"]),
-                "states": np.array(data["states"]),
+                "vocabulary": get_vocabulary(data["states"]),
                 "filename": data.get("filename", "default")
             }
             print(f"Loaded data for user {user_id}")
         elif os.path.exists(DEFAULT_CSV_PATH):
             # Load default data for new users
-            transition_matrix, states = compute_transition_matrix(DEFAULT_CSV_PATH)
+            transition_matrix, vocabulary = compute_transition_matrix(DEFAULT_CSV_PATH)
             user_data[user_id] = {
                 "transition_matrix": transition_matrix,
-                "states": states,
+                "vocabulary": vocabulary,
                 "filename": "default"
             }
             # Store in MongoDB
             await collection.insert_one({
                 "user_id": user_id,
                 "transition_matrix": transition_matrix.tolist(),
-                "states": states.tolist(),
+                "states": list(vocabulary.states),
                 "filename": "default"
             })
             print(f"Loaded default data for user {user_id}")
@@ -215,13 +204,13 @@ async def upload_csv(
 
         # Compute the transition matrix from the uploaded file
         print("Computing transition matrix...")
-        transition_matrix, states = compute_transition_matrix(file_path)
-        print(f"Computed transition matrix with states: {states}")
+        transition_matrix, vocabulary = compute_transition_matrix(file_path)
+        print(f"Computed transition matrix with states: {vocabulary.states}")
 
         # Store in user_data
         user_data[current_user.id] = {
             "transition_matrix": transition_matrix,
-            "states": states,
+            "vocabulary": vocabulary,
             "filename": file.filename
         }
         print(f"Stored data in memory for user {current_user.id}")
@@ -233,8 +222,8 @@ async def upload_csv(
         # Convert to list format for MongoDB storage
         mongo_data = {
             "user_id": current_user.id,
-            "transition_matrix": transition_matrix.tolist() if hasattr(transition_matrix, 'tolist') else transition_matrix,
-            "states": states.tolist() if hasattr(states, 'tolist') else states,
+            "transition_matrix": transition_matrix.tolist(),
+            "states": list(vocabulary.states),
             "filename": file.filename
         }
         
@@ -303,39 +292,27 @@ async def predict(
             user_weather_data = default_data
 
         transition_matrix = user_weather_data["transition_matrix"]
-        states = user_weather_data["states"]
-
-        # Convert states to list if it's a numpy array
-        if hasattr(states, 'tolist'):
-            states = states.tolist()
-        else:
-            states = list(states)
+        vocabulary = user_weather_data["vocabulary"]
+        states = vocabulary.states
 
         # Validate current_state
-        if current_state not in states:
-            available_states = ", ".join(states)
+        current_index = vocabulary.code(current_state)
+        if current_index is None:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid current_state: '{current_state}'. Must be one of: {available_states}"
+                detail=vocabulary.invalid_state_detail(current_state)
             )
 
         # Compute probabilities
-        current_index = states.index(current_state)
         Pn = np.linalg.matrix_power(transition_matrix, n_days)
         probabilities = Pn[current_index]
 
-        # Convert probabilities to list if it's a numpy array
-        if hasattr(probabilities, 'tolist'):
-            probabilities = probabilities.tolist()
-        else:
-            probabilities = list(probabilities)
-
         return {
             "message": f"Predictions for {n_days}th Day fetched",
             "data": {
                 "states": states,
-                "probabilities": probabilities,
-                "most_likely_state": states[np.argmax(probabilities)],
+                "probabilities": probabilities.tolist(),
+                "most_likely_state": states[int(np.argmax(probabilities))],
                 "data_source": "default" if user_weather_data is default_data else "user_uploaded"
             }
         }
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Tuple
+
+# Weather states accepted in uploaded CSV files (sorted for consistency)
+EXPECTED_STATES = ("drizzle", "fog", "rain", "snow", "sun")
+
+class StateVocabulary:
+    """
+    Fixed, interned mapping from weather state labels to compact uint8 codes.
+
+    Codes follow the sorted order of the labels, so a vocabulary built from a
+    subset of another vocabulary keeps the same relative ordering.
+    """
+    __slots__ = ("states", "_codes", "_error_detail", "_expected_detail")
+
+    def __init__(self, states: Iterable[str]):
+        self.states: Tuple[str, ...] = tuple(sorted(states))
+        self._codes: Dict[str, int] = {state: i for i, state in enumerate(self.states)}
+        self._error_detail: str = "Must be one of: " + ", ".join(self.states)
+        self._expected_detail: str = f"Expected states are: {set(self.states)}"
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __contains__(self, state: str) -> bool:
+        return state in self._codes
+
+    def code(self, state: str) -> Optional[int]:
+        """Return the code for a state label, or None if it is unknown."""
+        return self._codes.get(state)
+
+    def invalid_state_detail(self, state: str) -> str:
+        return f"Invalid current_state: '{state}'. {self._error_detail}"
+
+    def encode(self, labels: pd.Series) -> np.ndarray:
+        """
+        Normalize raw labels (strip + lowercase) and encode them as uint8 codes.
+
+        Raises ValueError listing the offending labels if any are not part of
+        this vocabulary.
+        """
+        normalized = labels.str.strip().str.lower()
+        codes = pd.Categorical(normalized, categories=self.states).codes
+        if (codes < 0).any():
+            invalid_states = set(normalized[codes < 0].unique())
+            raise ValueError(
+                f"Invalid weather states found: {invalid_states}. {self._expected_detail}"
+            )
+        return codes.astype(np.uint8)
+
+    def subset(self, codes: np.ndarray) -> "StateVocabulary":
+        """Build a vocabulary of the states whose codes appear in `codes`."""
+        present = np.unique(codes)
+        return get_vocabulary(self.states[i] for i in present)
+
+    def recode(self, codes: np.ndarray, other: "StateVocabulary") -> np.ndarray:
+        """Translate codes from this vocabulary into codes of `other`."""
+        lookup = np.zeros(len(self), dtype=np.uint8)
+        for state, i in other._codes.items():
+            lookup[self._codes[state]] = i
+        return lookup[codes]
+
+# Vocabularies are interned so datasets with the same states share one instance
+_vocabularies: Dict[Tuple[str, ...], StateVocabulary] = {}
+
+def get_vocabulary(states: Iterable[str]) -> StateVocabulary:
+    key = tuple(sorted(states))
+    vocabulary = _vocabularies.get(key)
+    if vocabulary is None:
+        vocabulary = _vocabularies[key] = StateVocabulary(key)
+    return vocabulary
+
+# Shared vocabulary of every accepted weather state
+WEATHER_STATES = get_vocabulary(EXPECTED_STATES)